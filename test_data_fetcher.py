@@ -4,53 +4,214 @@ TEST: Standalone Data Fetcher for SMI Testing
 No circular imports, clean CCXT implementation
 """
 
-import ccxt
+import os
+import time
+import json
+import asyncio
+import logging
+import ccxt.async_support as ccxt_async
+import numpy as np
 import pandas as pd
-from typing import Optional, List
+from typing import Dict, Optional, List, Set
+
+# Fallback order: (ccxt id, display name)
+EXCHANGE_PRIORITY = [
+    ('bingx', 'BingX'),
+    ('kucoin', 'KuCoin'),
+    ('okx', 'OKX'),
+]
+
+logger = logging.getLogger(__name__)
+
+# On-disk OHLCV cache, restored between scheduled runs by the workflow
+CACHE_DIR = os.environ.get('OHLCV_CACHE_DIR', os.path.join('.cache', 'ohlcv'))
+
+# Markets listings rarely change; reuse the cached copy for this long
+MARKETS_CACHE_DIR = os.environ.get('MARKETS_CACHE_DIR', os.path.join('.cache', 'markets'))
+MARKETS_TTL_SECONDS = int(os.environ.get('MARKETS_TTL_SECONDS', 6 * 3600))
+
+# Open exchange instances, shared until a fetcher closes them; ccxt's async
+# exchanges bind to the event loop they first run on, so close() drops them
+_EXCHANGES: Dict[str, ccxt_async.Exchange] = {}
+
+
+def get_exchange(exchange_id: str) -> ccxt_async.Exchange:
+    """Return the shared exchange instance, creating it on first use"""
+    exchange = _EXCHANGES.get(exchange_id)
+    if exchange is None:
+        exchange = _EXCHANGES[exchange_id] = getattr(ccxt_async, exchange_id)({
+            'enableRateLimit': True,
+            'options': {'defaultType': 'spot'}
+        })
+    return exchange
+
+
+def ohlcv_to_dataframe(ohlcv_list: list) -> pd.DataFrame:
+    """Convert CCXT OHLCV rows to a DataFrame indexed by UTC timestamp"""
+    # One float64 buffer, then column slices - avoids per-cell dtype inference
+    arr = np.asarray(ohlcv_list, dtype=np.float64)
+    index = pd.to_datetime(arr[:, 0].astype(np.int64), unit='ms', utc=True)
+    index.name = 'timestamp'
+    return pd.DataFrame({
+        'open': arr[:, 1],
+        'high': arr[:, 2],
+        'low': arr[:, 3],
+        'close': arr[:, 4],
+        'volume': arr[:, 5],
+    }, index=index)
+
+
+def _cache_path(exchange_id: str, symbol: str, timeframe: str) -> str:
+    """Cache file for one (exchange, symbol, timeframe) series"""
+    return os.path.join(CACHE_DIR, f"{exchange_id}_{symbol.replace('/', '-')}_{timeframe}.npy")
+
+
+def load_cached_ohlcv(exchange_id: str, symbol: str, timeframe: str) -> Optional[np.ndarray]:
+    """Load cached OHLCV rows as a float64 array, or None if missing/unreadable"""
+    try:
+        return np.load(_cache_path(exchange_id, symbol, timeframe))
+    except Exception:
+        return None
+
+
+def store_cached_ohlcv(exchange_id: str, symbol: str, timeframe: str, arr: np.ndarray):
+    """Atomically replace the cached OHLCV rows"""
+    path = _cache_path(exchange_id, symbol, timeframe)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(path + '.tmp', 'wb') as f:
+            np.save(f, arr)
+        os.replace(path + '.tmp', path)
+    except Exception as e:
+        logger.warning("  ⚠️ Cache write failed for %s: %s", symbol, e)
+
+
+def load_cached_markets(exchange: ccxt_async.Exchange) -> bool:
+    """Populate exchange markets from the disk cache if it is fresh; True on success"""
+    path = os.path.join(MARKETS_CACHE_DIR, f"{exchange.id}.json")
+    try:
+        if time.time() - os.path.getmtime(path) >= MARKETS_TTL_SECONDS:
+            return False
+        # Plain JSON: the file comes back from a shared CI cache, so it must
+        # never be able to run code when read
+        with open(path, 'r') as f:
+            markets, currencies = json.load(f)
+        exchange.set_markets(markets, currencies)
+        return True
+    except Exception:
+        return False
+
+
+def store_cached_markets(exchange: ccxt_async.Exchange):
+    """Atomically write the exchange's loaded markets to the disk cache"""
+    path = os.path.join(MARKETS_CACHE_DIR, f"{exchange.id}.json")
+    try:
+        os.makedirs(MARKETS_CACHE_DIR, exist_ok=True)
+        with open(path + '.tmp', 'w') as f:
+            json.dump([exchange.markets, exchange.currencies], f, separators=(',', ':'))
+        os.replace(path + '.tmp', path)
+    except Exception as e:
+        logger.warning("⚠️ Markets cache write failed for %s: %s", exchange.id, e)
+
 
 class TestDataFetcher:
     """Fetch OHLCV data with exchange fallback"""
     
-    def __init__(self):
+    def __init__(self, max_concurrent: int = 10):
         self.exchanges = self._init_exchanges()
+        # exchange id -> set of listed symbols, filled once markets are loaded
+        self.symbols: Dict[str, Set[str]] = {}
+        # Bounds in-flight requests across all concurrently analyzed coins
+        self.semaphore = asyncio.Semaphore(max_concurrent)
     
-    def _init_exchanges(self) -> List[ccxt.Exchange]:
+    def _init_exchanges(self) -> List[ccxt_async.Exchange]:
         """Initialize exchanges in fallback order"""
         exchanges = []
         
-        try:
-            exchanges.append(ccxt.bingx({
-                'enableRateLimit': True,
-                'options': {'defaultType': 'spot'}
-            }))
-            print("✓ BingX initialized")
-        except Exception as e:
-            print(f"⚠️ BingX init failed: {e}")
-        
-        try:
-            exchanges.append(ccxt.kucoin({
-                'enableRateLimit': True,
-                'options': {'defaultType': 'spot'}
-            }))
-            print("✓ KuCoin initialized")
-        except Exception as e:
-            print(f"⚠️ KuCoin init failed: {e}")
-        
-        try:
-            exchanges.append(ccxt.okx({
-                'enableRateLimit': True,
-                'options': {'defaultType': 'spot'}
-            }))
-            print("✓ OKX initialized")
-        except Exception as e:
-            print(f"⚠️ OKX init failed: {e}")
+        for exchange_id, name in EXCHANGE_PRIORITY:
+            try:
+                exchanges.append(get_exchange(exchange_id))
+                logger.info("✓ %s initialized", name)
+            except Exception as e:
+                logger.warning("⚠️ %s init failed: %s", name, e)
         
         if not exchanges:
             raise Exception("No exchanges available!")
         
         return exchanges
     
-    def fetch_ohlcv(self, symbol: str, timeframe: str, limit: int = 100) -> Optional[pd.DataFrame]:
+    async def load_markets(self):
+        """Load markets for every exchange once, up front"""
+        # Failed exchanges are retried lazily from fetch_ohlcv
+        await asyncio.gather(
+            *[self._get_symbols(exchange) for exchange in self.exchanges],
+            return_exceptions=True
+        )
+    
+    async def _get_symbols(self, exchange: ccxt_async.Exchange) -> Set[str]:
+        """Return the exchange's symbols as a set, loading markets on first use"""
+        symbols = self.symbols.get(exchange.id)
+        if symbols is None:
+            if exchange.markets:
+                source = 'memory'
+            elif load_cached_markets(exchange):
+                source = 'cache'
+            else:
+                source = 'exchange'
+                try:
+                    await exchange.load_markets(reload=False)
+                except Exception as e:
+                    logger.warning("⚠️ %s markets failed: %.50s", exchange.id, e)
+                    raise
+                store_cached_markets(exchange)
+            symbols = self.symbols[exchange.id] = set(exchange.symbols)
+            logger.info("✓ %s markets loaded from %s (%d symbols)", exchange.id, source, len(symbols))
+        return symbols
+    
+    async def _fetch_cached(self, exchange: ccxt_async.Exchange, symbol: str,
+                            timeframe: str, limit: int) -> Optional[np.ndarray]:
+        """
+        Fetch the latest `limit` candles, reusing the disk cache when possible
+        
+        When a full cached window is recent enough, only candles from the last
+        cached timestamp onward are requested; that last candle may still have
+        been open when cached, so it is replaced by the fresh copy. A reply that
+        does not overlap the cache falls back to a full fetch.
+        """
+        cached = load_cached_ohlcv(exchange.id, symbol, timeframe)
+        if cached is not None and len(cached) >= limit:
+            last_ts = int(cached[-1, 0])
+            tf_ms = exchange.parse_timeframe(timeframe) * 1000
+            
+            # Top up only if the missing candles fit in a single request
+            if exchange.milliseconds() - last_ts < (limit - 1) * tf_ms:
+                async with self.semaphore:
+                    ohlcv_list = await exchange.fetch_ohlcv(symbol, timeframe, since=last_ts, limit=limit)
+                
+                fresh = np.asarray(ohlcv_list, dtype=np.float64) if ohlcv_list else None
+                
+                # Splice only if the reply overlaps the cache; one starting after
+                # last_ts (since= ignored or candles skipped) would leave the stale
+                # cached candle in place and a silent gap in the series
+                if fresh is not None and fresh[0, 0] <= last_ts:
+                    arr = np.concatenate([cached[cached[:, 0] < fresh[0, 0]], fresh])[-limit:]
+                    store_cached_ohlcv(exchange.id, symbol, timeframe, arr)
+                    logger.debug("  ♻️ %s cache hit, fetched %d new candles from %s", symbol, len(fresh), exchange.id)
+                    return arr
+                
+                logger.debug("  ♻️ %s top-up from %s does not overlap the cache, refetching", symbol, exchange.id)
+        
+        async with self.semaphore:
+            ohlcv_list = await exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+        
+        if not ohlcv_list:
+            return None
+        
+        arr = np.asarray(ohlcv_list, dtype=np.float64)
+        store_cached_ohlcv(exchange.id, symbol, timeframe, arr)
+        return arr
+    
+    async def fetch_ohlcv(self, symbol: str, timeframe: str, limit: int = 100) -> Optional[pd.DataFrame]:
         """
         Fetch OHLCV data and return as pandas DataFrame
         
@@ -64,37 +225,40 @@ class TestDataFetcher:
         """
         for exchange in self.exchanges:
             try:
-                # Load markets
-                if not exchange.markets:
-                    exchange.load_markets()
-                
                 # Check symbol exists
-                if symbol not in exchange.markets:
-                    print(f"  ⏭️ {symbol} not on {exchange.id}")
+                if symbol not in await self._get_symbols(exchange):
+                    logger.debug("  ⏭️ %s not on %s", symbol, exchange.id)
                     continue
                 
                 # Fetch OHLCV
-                ohlcv_list = exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+                ohlcv = await self._fetch_cached(exchange, symbol, timeframe, limit)
                 
-                if not ohlcv_list or len(ohlcv_list) < 50:
-                    print(f"  ⏭️ Insufficient data from {exchange.id}")
+                if ohlcv is None or len(ohlcv) < 50:
+                    logger.debug("  ⏭️ Insufficient %s data from %s", symbol, exchange.id)
                     continue
                 
-                # Convert to DataFrame
-                df = pd.DataFrame(
-                    ohlcv_list, 
-                    columns=['timestamp', 'open', 'high', 'low', 'close', 'volume']
-                )
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms', utc=True)
-                df.set_index('timestamp', inplace=True)
-                df = df.sort_index()
+                df = ohlcv_to_dataframe(ohlcv)
                 
-                print(f"  ✅ Fetched {len(df)} candles from {exchange.id}")
+                # CCXT returns candles oldest-first; only sort if an exchange doesn't
+                if not df.index.is_monotonic_increasing:
+                    df = df.sort_index()
+                
+                logger.info("  ✅ Fetched %d %s candles from %s", len(df), symbol, exchange.id)
                 return df
                     
             except Exception as e:
-                print(f"  ✗ {exchange.id} error: {str(e)[:50]}")
+                logger.warning("  ✗ %s error for %s: %.50s", exchange.id, symbol, e)
                 continue
         
-        print(f"  ❌ Failed to fetch {symbol} from all exchanges")
+        logger.warning("  ❌ Failed to fetch %s from all exchanges", symbol)
         return None
+    
+    async def close(self):
+        """Close exchange HTTP sessions and drop them from the shared registry"""
+        for exchange in self.exchanges:
+            if _EXCHANGES.get(exchange.id) is exchange:
+                del _EXCHANGES[exchange.id]
+            try:
+                await exchange.close()
+            except Exception as e:
+                logger.warning("⚠️ %s close failed: %s", exchange.id, e)
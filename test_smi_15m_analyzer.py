@@ -6,15 +6,43 @@ GitHub Actions Testing - No AWS
 
 import os
 import sys
+import asyncio
+import logging
+import functools
+import queue
+import logging.handlers
 import requests
 import pandas as pd
 from datetime import datetime
 from test_smi_indicator import TestSMI
 from test_data_fetcher import TestDataFetcher
 
+logger = logging.getLogger(__name__)
+
+SECTION_RULE = '=' * 60
+BANNER_RULE = '#' * 60
+
+# Keep-alive session reused for every Telegram request
+_SESSION = requests.Session()
+
+@functools.lru_cache(maxsize=1)
+def load_coins(path='coins.txt'):
+    """Load coins from coins.txt once per process, as an immutable tuple"""
+    try:
+        with open(path, 'r') as f:
+            # dict keeps first-seen order while dropping repeats, so a coin
+            # listed twice is fetched and alerted once
+            coins = tuple(dict.fromkeys(ln for ln in (line.strip().upper() for line in f)
+                                        if ln and not ln.startswith('#')))
+        logger.info("📋 Loaded %d test coins: %s", len(coins), coins)
+        return coins
+    except Exception as e:
+        logger.error("❌ Failed to load %s: %s", path, e)
+        return ()
+
 class Test15MAnalyzer:
     def __init__(self):
-        print("🔧 Initializing Test Analyzer...")
+        logger.info("🔧 Initializing Test Analyzer...")
         
         self.smi = TestSMI(
             length_k=10,
@@ -24,76 +52,65 @@ class Test15MAnalyzer:
             oversold=-40
         )
         
-        print("📡 Initializing data fetcher...")
+        logger.info("📡 Initializing data fetcher...")
         self.data_fetcher = TestDataFetcher()
         
         self.telegram_bot_token = os.environ.get('TELEGRAM_BOT_TOKEN')
         self.telegram_chat_id = os.environ.get('TELEGRAM_CHAT_ID')
         
-        self.test_coins = self.load_coins()
+        self.test_coins = load_coins()
     
-    def load_coins(self):
-        """Load coins from coins.txt"""
-        try:
-            with open('coins.txt', 'r') as f:
-                coins = [line.strip().upper() for line in f if line.strip() and not line.startswith('#')]
-            print(f"📋 Loaded {len(coins)} test coins: {coins}")
-            return coins
-        except Exception as e:
-            print(f"❌ Failed to load coins.txt: {e}")
-            return []
-    
-    def analyze_coin(self, symbol):
+    async def analyze_coin(self, symbol):
         """Analyze single coin on 15M"""
-        print(f"\n{'='*60}")
-        print(f"🔍 Analyzing {symbol} on 15M")
-        print(f"{'='*60}")
-        
         try:
             # Format symbol for CCXT
             trading_symbol = f"{symbol}/USDT"
-            print(f"  Trading pair: {trading_symbol}")
             
             # Fetch 15M data (already returns DataFrame)
-            df = self.data_fetcher.fetch_ohlcv(trading_symbol, '15m', limit=100)
+            df = await self.data_fetcher.fetch_ohlcv(trading_symbol, '15m', limit=100)
+            
+            # Other coins' fetches interleave above; the analysis below runs
+            # without awaiting, so its log block stays together
+            logger.info("\n%s\n🔍 Analyzing %s on 15M\n%s", SECTION_RULE, symbol, SECTION_RULE)
+            logger.debug("  Trading pair: %s", trading_symbol)
             
             if df is None or len(df) < 30:
-                print(f"  ❌ Insufficient data for {symbol}")
+                logger.warning("  ❌ Insufficient data for %s", symbol)
                 return None
             
-            print(f"  📅 First: {df.index[0]}")
-            print(f"  📅 Latest: {df.index[-1]}")
-            print(f"  💰 Price: ${df['close'].iloc[-1]:.4f}")
+            # Work on the raw ndarrays from here on, no pandas indexing per value
+            highs = df['high'].to_numpy()
+            lows = df['low'].to_numpy()
+            closes = df['close'].to_numpy()
+            
+            logger.debug("  📅 First: %s", df.index[0])
+            logger.debug("  📅 Latest: %s", df.index[-1])
+            logger.info("  💰 Price: $%.4f", closes[-1])
             
             # Analyze SMI
-            result = self.smi.analyze_15m(
-                df['high'].values,
-                df['low'].values,
-                df['close'].values,
-                df.index
-            )
+            result = self.smi.analyze_15m(highs, lows, closes, df.index)
             
             if not result:
-                print(f"  ℹ️ No SMI result for {symbol}")
+                logger.info("  ℹ️ No SMI result for %s", symbol)
                 return None
             
-            crosses = result.get('crosses', [])
+            # analyze_15m reports at most one cross, details under 'cross_info'
+            cross_data = result.get('cross')
+            crosses = [cross_data['cross_info']] if cross_data else []
             
             if not crosses:
-                print(f"  ℹ️ No crossovers detected")
+                logger.info("  ℹ️ No crossovers detected")
                 return None
             
+            # Price and 24h change are the same for every cross
+            price = float(closes[-1])
+            change_24h = 0.0
+            if len(closes) >= 96:  # 96 * 15min = 24h
+                change_24h = (price / float(closes[-96]) - 1.0) * 100
+            
             # Prepare alerts
             alerts = []
             for cross in crosses:
-                price = float(df['close'].iloc[-1])
-                
-                # Calculate 24h change
-                change_24h = 0.0
-                if len(df) >= 96:  # 96 * 15min = 24h
-                    old_price = float(df['close'].iloc[-96])
-                    change_24h = ((price - old_price) / old_price) * 100
-                
                 alerts.append({
                     'symbol': symbol,
                     'cross_type': cross['cross_type'],
@@ -111,50 +128,48 @@ class Test15MAnalyzer:
             return alerts
             
         except Exception as e:
-            print(f"  ❌ Error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("  ❌ Error: %s", e)
             return None
     
     def send_telegram(self, alerts):
         """Send alerts to Telegram"""
         if not self.telegram_bot_token or not self.telegram_chat_id:
-            print("⚠️ Telegram credentials missing, skipping send")
+            logger.warning("⚠️ Telegram credentials missing, skipping send")
             return False
         
-        msg = "🧪 **TEST: 15M SMI CROSSOVER** 🧪\n"
-        msg += f"⏰ {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}\n\n"
-        msg += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+        ts = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')
+        parts = [
+            "🧪 **TEST: 15M SMI CROSSOVER** 🧪\n"
+            f"⏰ {ts}\n\n"
+            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+        ]
         
         for i, alert in enumerate(alerts, 1):
             symbol = alert['symbol']
             cross_type = alert['cross_type']
-            candle_time = alert['candle_time']
-            price = alert['price']
             change_24h = alert['change_24h']
-            k_prev = alert['k_prev']
-            d_prev = alert['d_prev']
-            k_curr = alert['k_curr']
-            d_curr = alert['d_curr']
-            k_at_cross = alert['k_at_cross']
             
             emoji = '🟢' if cross_type == 'OVERSOLD' else '🔴'
             cross_dir = '↗️' if alert['bullish_cross'] else '↘️'
             change_emoji = '📈' if change_24h > 0 else '📉'
-            
-            msg += f"{i}. {emoji} **{symbol}** - {cross_type}\n"
-            msg += f"   💰 ${price:.4f} | {change_emoji} {change_24h:+.2f}%\n"
-            msg += f"   {cross_dir} Cross @ {candle_time.strftime('%H:%M UTC')}\n"
-            msg += f"   📊 Prev: %K={k_prev:.2f} %D={d_prev:.2f}\n"
-            msg += f"   📊 Curr: %K={k_curr:.2f} %D={d_curr:.2f}\n"
-            msg += f"   📊 @Cross: %K≈{k_at_cross:.2f}\n"
-            
             tv_url = f"https://www.tradingview.com/chart/?symbol=BINANCE:{symbol}USDT&interval=15"
-            msg += f"   📊 [Chart]({tv_url})\n\n"
+            
+            parts.append(
+                f"{i}. {emoji} **{symbol}** - {cross_type}\n"
+                f"   💰 ${alert['price']:.4f} | {change_emoji} {change_24h:+.2f}%\n"
+                f"   {cross_dir} Cross @ {alert['candle_time']:%H:%M UTC}\n"
+                f"   📊 Prev: %K={alert['k_prev']:.2f} %D={alert['d_prev']:.2f}\n"
+                f"   📊 Curr: %K={alert['k_curr']:.2f} %D={alert['d_curr']:.2f}\n"
+                f"   📊 @Cross: %K≈{alert['k_at_cross']:.2f}\n"
+                f"   📊 [Chart]({tv_url})\n\n"
+            )
         
-        msg += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-        msg += f"Total Crosses: {len(alerts)}\n"
-        msg += "🧪 GitHub Actions Test\n"
+        parts.append(
+            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+            f"Total Crosses: {len(alerts)}\n"
+            "🧪 GitHub Actions Test\n"
+        )
+        msg = ''.join(parts)
         
         try:
             url = f"https://api.telegram.org/bot{self.telegram_bot_token}/sendMessage"
@@ -165,57 +180,86 @@ class Test15MAnalyzer:
                 'disable_web_page_preview': True
             }
             
-            response = requests.post(url, json=payload, timeout=10)
+            response = _SESSION.post(url, json=payload, timeout=10)
             response.raise_for_status()
             
-            print(f"✅ Telegram sent successfully")
+            logger.info("✅ Telegram sent successfully")
             return True
             
         except Exception as e:
-            print(f"❌ Telegram failed: {e}")
+            logger.error("❌ Telegram failed: %s", e)
             return False
     
+    async def analyze_all(self):
+        """Analyze all coins concurrently, sharing one fetcher across tasks"""
+        try:
+            await self.data_fetcher.load_markets()
+            return await asyncio.gather(*[self.analyze_coin(symbol) for symbol in self.test_coins])
+        finally:
+            await self.data_fetcher.close()
+    
     def run(self):
         """Run test analysis"""
-        print(f"\n{'#'*60}")
-        print(f"# TEST: 15M SMI CROSSOVER DETECTION")
-        print(f"# Time: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}")
-        print(f"{'#'*60}\n")
+        logger.info("\n%s", BANNER_RULE)
+        logger.info("# TEST: 15M SMI CROSSOVER DETECTION")
+        logger.info("# Time: %s", datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC'))
+        logger.info("%s\n", BANNER_RULE)
         
         if not self.test_coins:
-            print("❌ No test coins loaded")
+            logger.error("❌ No test coins loaded")
             return
         
         all_alerts = []
         
-        for symbol in self.test_coins:
-            alerts = self.analyze_coin(symbol)
+        for alerts in asyncio.run(self.analyze_all()):
             if alerts:
                 all_alerts.extend(alerts)
         
-        print(f"\n{'='*60}")
-        print(f"📊 SUMMARY")
-        print(f"{'='*60}")
-        print(f"Coins analyzed: {len(self.test_coins)}")
-        print(f"Crosses found: {len(all_alerts)}")
+        logger.info("\n%s", SECTION_RULE)
+        logger.info("📊 SUMMARY")
+        logger.info("%s", SECTION_RULE)
+        logger.info("Coins analyzed: %d", len(self.test_coins))
+        logger.info("Crosses found: %d", len(all_alerts))
         
         if all_alerts:
-            print(f"\n📨 Sending {len(all_alerts)} alerts to Telegram...")
+            logger.info("\n📨 Sending %d alerts to Telegram...", len(all_alerts))
             self.send_telegram(all_alerts)
         else:
-            print(f"\nℹ️ No crossovers detected")
+            logger.info("\nℹ️ No crossovers detected")
         
-        print(f"\n{'#'*60}")
-        print(f"# TEST COMPLETE")
-        print(f"{'#'*60}\n")
+        logger.info("\n%s", BANNER_RULE)
+        logger.info("# TEST COMPLETE")
+        logger.info("%s\n", BANNER_RULE)
+
+
+def setup_logging():
+    """
+    Log through a queue so stdout writes happen on a listener thread,
+    not inside the event loop; returns the started listener
+    """
+    log_queue = queue.SimpleQueue()
+    
+    # QueueHandler formats the record; the listener only writes it out
+    logging.basicConfig(
+        level=os.environ.get('LOG_LEVEL', 'INFO').upper(),
+        format='%(message)s',
+        handlers=[logging.handlers.QueueHandler(log_queue)]
+    )
+    
+    listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler(sys.stdout))
+    listener.start()
+    return listener
 
 
 if __name__ == '__main__':
+    listener = setup_logging()
+    
     try:
         analyzer = Test15MAnalyzer()
         analyzer.run()
     except Exception as e:
-        print(f"\n❌ FATAL ERROR: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("\n❌ FATAL ERROR: %s", e)
         sys.exit(1)
+    finally:
+        # Drain queued records before the interpreter exits
+        listener.stop()
@@ -4,9 +4,37 @@ TEST: SMI - 100% Exact Pine Script Match
 Fixes calculation discrepancies
 """
 
+import logging
 import numpy as np
 import pandas as pd
 from datetime import datetime
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+
+def _ema(x, length):
+    """ta.ema() over a float64 array - pandas ewm with adjust=False"""
+    return pd.Series(x).ewm(span=length, adjust=False).mean().to_numpy()
+
+
+# Strided window views reduce in C with no pandas rolling objects;
+# a NaN anywhere in the window yields NaN, as with min_periods=window
+def _rolling_max(x, window):
+    """ta.highest() - max over the last `window` values, NaN until the window is full"""
+    out = np.full_like(x, np.nan)
+    if x.shape[0] >= window:
+        out[window - 1:] = sliding_window_view(x, window).max(axis=-1)
+    return out
+
+
+def _rolling_min(x, window):
+    """ta.lowest() - mirror of _rolling_max"""
+    out = np.full_like(x, np.nan)
+    if x.shape[0] >= window:
+        out[window - 1:] = sliding_window_view(x, window).min(axis=-1)
+    return out
+
 
 class TestSMI:
     def __init__(self, length_k=10, length_d=3, length_ema=3, 
@@ -18,14 +46,15 @@ class TestSMI:
         self.overbought = overbought
         self.oversold = oversold
         
-        print(f"🔧 SMI Config: K={length_k}, D={length_d}, EMA={length_ema}, OB={overbought}, OS={oversold}")
+        logger.info("🔧 SMI Config: K=%s, D=%s, EMA=%s, OB=%s, OS=%s",
+                    length_k, length_d, length_ema, overbought, oversold)
     
     def ema(self, series, length):
         """
         EMA - EXACT Pine Script ta.ema()
         Uses pandas ewm with adjust=False to match Pine Script
         """
-        return pd.Series(series).ewm(span=length, adjust=False).mean().values
+        return _ema(np.ascontiguousarray(series, dtype=np.float64), length)
     
     def ema_ema(self, series, length):
         """
@@ -47,33 +76,30 @@ class TestSMI:
         relativeRange = close - (highestHigh + lowestLow) / 2
         smi = 200 * (emaEma(relativeRange, lengthD) / emaEma(highestLowestRange, lengthD))
         """
-        # Convert to pandas Series for rolling calculations
-        high_series = pd.Series(high)
-        low_series = pd.Series(low)
-        close_series = pd.Series(close)
+        high = np.ascontiguousarray(high, dtype=np.float64)
+        low = np.ascontiguousarray(low, dtype=np.float64)
+        close = np.ascontiguousarray(close, dtype=np.float64)
         
         # CRITICAL: Pine Script ta.highest/ta.lowest include current bar
-        # pandas rolling(N) includes current + previous (N-1) bars ✓
-        highest_high = high_series.rolling(window=self.length_k, min_periods=self.length_k).max()
-        lowest_low = low_series.rolling(window=self.length_k, min_periods=self.length_k).min()
+        # Window covers current + previous (N-1) bars ✓
+        highest_high = _rolling_max(high, self.length_k)
+        lowest_low = _rolling_min(low, self.length_k)
         
         # Calculate ranges
         highest_lowest_range = highest_high - lowest_low
-        relative_range = close_series - (highest_high + lowest_low) / 2
+        relative_range = close - (highest_high + lowest_low) / 2
         
         # Double EMA smoothing
-        numerator = self.ema_ema(relative_range.values, self.length_d)
-        denominator = self.ema_ema(highest_lowest_range.values, self.length_d)
-        
-        # SMI calculation (%K)
-        smi_k = np.full_like(close, np.nan, dtype=float)
+        numerator = self.ema_ema(relative_range, self.length_d)
+        denominator = self.ema_ema(highest_lowest_range, self.length_d)
         
-        # Only calculate where denominator is valid and non-zero
+        # SMI calculation (%K), only where denominator is valid and non-zero
+        smi_k = np.full_like(close, np.nan)
         valid_mask = (~np.isnan(denominator)) & (np.abs(denominator) > 1e-10)
         smi_k[valid_mask] = 200 * (numerator[valid_mask] / denominator[valid_mask])
         
         # %D = EMA of %K (signal line)
-        smi_d = self.ema(smi_k, self.length_ema)
+        smi_d = _ema(smi_k, self.length_ema)
         
         return smi_k, smi_d
     
@@ -103,15 +129,18 @@ class TestSMI:
             cross_type = 'OVERBOUGHT'
         
         if not cross_type:
-            print(f"    ⏭️ Cross @ {candle_time} but NOT in OB/OS zone (K≈{k_at_cross:.2f})")
+            logger.debug("    ⏭️ Cross @ %s but NOT in OB/OS zone (K≈%.2f)", candle_time, k_at_cross)
             return None
         
-        # Debug output
-        print(f"    ✅ CROSS DETECTED @ {candle_time}")
-        print(f"       Type: {'Bullish ↗️' if bullish_cross else 'Bearish ↘️'} in {cross_type}")
-        print(f"       Prev: %K={k_prev:.2f} %D={d_prev:.2f}")
-        print(f"       Curr: %K={k_curr:.2f} %D={d_curr:.2f}")
-        print(f"       @Cross: %K≈{k_at_cross:.2f}")
+        # Debug output - details go out as one record, and only when DEBUG is on
+        logger.info("    ✅ CROSS DETECTED @ %s", candle_time)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("       Type: %s in %s\n"
+                         "       Prev: %%K=%.2f %%D=%.2f\n"
+                         "       Curr: %%K=%.2f %%D=%.2f\n"
+                         "       @Cross: %%K≈%.2f",
+                         'Bullish ↗️' if bullish_cross else 'Bearish ↘️', cross_type,
+                         k_prev, d_prev, k_curr, d_curr, k_at_cross)
         
         return {
             'cross_type': cross_type,
@@ -136,10 +165,10 @@ class TestSMI:
         n = len(smi_k)
         
         if n < 2:
-            print(f"  ⚠️ Not enough data points: {n}")
+            logger.warning("  ⚠️ Not enough data points: %d", n)
             return None
         
-        print(f"  🔍 Checking last 2 candles for crosses...")
+        logger.debug("  🔍 Checking last 2 candles for crosses...")
         
         # Priority 1: Current/running candle (index -1)
         current_idx = n - 1
@@ -150,7 +179,7 @@ class TestSMI:
             d_curr = smi_d[current_idx]
             candle_time = timestamps[current_idx]
             
-            print(f"    Candle {current_idx} (CURRENT) @ {candle_time}: %K={k_curr:.2f} %D={d_curr:.2f}")
+            logger.debug("    Candle %d (CURRENT) @ %s: %%K=%.2f %%D=%.2f", current_idx, candle_time, k_curr, d_curr)
             
             cross = self.detect_cross_in_candle(k_prev, d_prev, k_curr, d_curr, candle_time)
             
@@ -170,7 +199,7 @@ class TestSMI:
             d_curr = smi_d[prev_idx]
             candle_time = timestamps[prev_idx]
             
-            print(f"    Candle {prev_idx} (PREVIOUS) @ {candle_time}: %K={k_curr:.2f} %D={d_curr:.2f}")
+            logger.debug("    Candle %d (PREVIOUS) @ %s: %%K=%.2f %%D=%.2f", prev_idx, candle_time, k_curr, d_curr)
             
             cross = self.detect_cross_in_candle(k_prev, d_prev, k_curr, d_curr, candle_time)
             
@@ -181,7 +210,7 @@ class TestSMI:
                     'cross_info': cross
                 }
         
-        print(f"    ℹ️ No crosses in last 2 candles")
+        logger.debug("    ℹ️ No crosses in last 2 candles")
         return None
     
     def analyze_15m(self, high, low, close, timestamps):
@@ -190,31 +219,32 @@ class TestSMI:
         Returns latest cross only (no duplicates)
         """
         if len(close) < self.length_k + self.length_d + self.length_ema + 10:
-            print(f"  ⚠️ Not enough data: {len(close)} candles (need {self.length_k + self.length_d + self.length_ema + 10})")
+            logger.warning("  ⚠️ Not enough data: %d candles (need %d)",
+                           len(close), self.length_k + self.length_d + self.length_ema + 10)
             return None
         
         # Calculate SMI
-        print(f"  📊 Calculating SMI...")
+        logger.debug("  📊 Calculating SMI...")
         smi_k, smi_d = self.calculate_smi(high, low, close)
         
         # Find valid indices
         valid_indices = np.where(~np.isnan(smi_k) & ~np.isnan(smi_d))[0]
         if len(valid_indices) == 0:
-            print(f"  ⚠️ No valid SMI values")
+            logger.warning("  ⚠️ No valid SMI values")
             return None
         
         latest_idx = valid_indices[-1]
         latest_k = smi_k[latest_idx]
         latest_d = smi_d[latest_idx]
         
-        print(f"  📊 Latest SMI: %K={latest_k:.2f} %D={latest_d:.2f}")
-        print(f"  📊 TradingView should show: %K≈{latest_k:.2f} %D≈{latest_d:.2f}")
+        logger.info("  📊 Latest SMI: %%K=%.2f %%D=%.2f", latest_k, latest_d)
+        logger.debug("  📊 TradingView should show: %%K≈%.2f %%D≈%.2f", latest_k, latest_d)
         
         # Find latest cross (Priority: current, then previous)
         cross_data = self.find_latest_cross(smi_k, smi_d, timestamps)
         
         if cross_data:
-            print(f"  ✅ Found crossover")
+            logger.info("  ✅ Found crossover")
             return {
                 'smi_k': smi_k,
                 'smi_d': smi_d,
@@ -223,7 +253,7 @@ class TestSMI:
                 'cross': cross_data
             }
         else:
-            print(f"  ℹ️ No crossover detected")
+            logger.info("  ℹ️ No crossover detected")
             return {
                 'smi_k': smi_k,
                 'smi_d': smi_d,